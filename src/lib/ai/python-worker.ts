@@ -0,0 +1,241 @@
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import logger from '@/utils/logger';
+
+interface PendingRequest {
+  resolve: (value: any) => void;
+  reject: (reason: Error) => void;
+  timer: ReturnType<typeof setTimeout> | null;
+}
+
+/**
+ * Default per-request timeout, counted from when the worker reports ready
+ */
+const DEFAULT_REQUEST_TIMEOUT_MS = 120000;
+
+/**
+ * Default startup budget (imports, first-run weight downloads, torch.compile warm-up)
+ */
+const DEFAULT_STARTUP_TIMEOUT_MS = 900000;
+
+/**
+ * Long-lived Python worker (yolo/worker.py)
+ * Keeps one process per model type alive so weights are loaded once and reused across frames.
+ * Requests and responses are line-delimited JSON matched by id.
+ */
+export class PythonWorker {
+  private child: ChildProcessWithoutNullStreams | null = null;
+  private pending: Map<number, PendingRequest> = new Map();
+  private nextId = 1;
+  private stdoutBuffer = '';
+  private stderrTail = '';
+  private lastError: string | null = null;
+  private ready = false;
+  private startupTimer: ReturnType<typeof setTimeout> | null = null;
+
+  /**
+   * @param label Name used in error messages (e.g. "YOLO", "CLIP", "OCR")
+   * @param pythonCommand Python executable
+   * @param workerScriptPath Path to yolo/worker.py
+   * @param modelType Model the worker preloads ("detect" | "clip" | "ocr")
+   * @param requestTimeoutMs A request taking longer than this kills the worker; the next request respawns it.
+   *   Requests sent before the worker is ready start their timer once it reports ready.
+   * @param startupTimeoutMs Time allowed for the worker to load its model and report ready
+   */
+  constructor(
+    private label: string,
+    private pythonCommand: string,
+    private workerScriptPath: string,
+    private modelType: 'detect' | 'clip' | 'ocr',
+    private requestTimeoutMs: number = DEFAULT_REQUEST_TIMEOUT_MS,
+    private startupTimeoutMs: number = DEFAULT_STARTUP_TIMEOUT_MS
+  ) {}
+
+  /**
+   * Send a request to the worker and resolve with its JSON response
+   * Responses carrying an "error" field are resolved as-is; callers decide how to surface them.
+   */
+  request(payload: Record<string, unknown>): Promise<any> {
+    return new Promise((resolve, reject) => {
+      let child: ChildProcessWithoutNullStreams;
+      try {
+        child = this.ensureStarted();
+      } catch (error: any) {
+        reject(new Error(`${this.label} process failed: ${error?.message}`));
+        return;
+      }
+
+      const id = this.nextId++;
+      const pending: PendingRequest = { resolve, reject, timer: null };
+      this.pending.set(id, pending);
+      if (this.ready) {
+        this.startRequestTimer(pending);
+      }
+      child.stdin.write(JSON.stringify({ ...payload, id }) + '\n');
+    });
+  }
+
+  /**
+   * Stop the worker process (pending requests are rejected)
+   */
+  shutdown(): void {
+    if (this.child) {
+      this.child.stdin.end();
+      this.child.kill();
+    }
+  }
+
+  private startRequestTimer(pending: PendingRequest): void {
+    pending.timer = setTimeout(() => {
+      logger.warn({ worker: this.label, timeoutMs: this.requestTimeoutMs }, 'Python worker request timed out - restarting worker');
+      this.stop(`${this.label} request timed out after ${this.requestTimeoutMs}ms`);
+    }, this.requestTimeoutMs);
+  }
+
+  private clearStartupTimer(): void {
+    if (this.startupTimer) {
+      clearTimeout(this.startupTimer);
+      this.startupTimer = null;
+    }
+  }
+
+  /**
+   * Kill the current worker and reject its pending requests right away
+   * Detaching first means the next request spawns a fresh process instead of queueing behind a hung one.
+   */
+  private stop(message: string): void {
+    const child = this.child;
+    this.child = null;
+    this.clearStartupTimer();
+    this.failPending(message);
+    if (child) {
+      child.kill('SIGKILL');
+    }
+  }
+
+  private ensureStarted(): ChildProcessWithoutNullStreams {
+    if (this.child) {
+      return this.child;
+    }
+
+    const child = spawn(this.pythonCommand, [this.workerScriptPath, this.modelType], {
+      cwd: process.cwd(),
+      env: process.env,
+      shell: process.platform === 'win32',
+    });
+
+    this.stdoutBuffer = '';
+    this.stderrTail = '';
+    this.lastError = null;
+    this.ready = false;
+    this.clearStartupTimer();
+    this.startupTimer = setTimeout(() => {
+      logger.warn({ worker: this.label, timeoutMs: this.startupTimeoutMs }, 'Python worker did not become ready - restarting worker');
+      this.stop(`${this.label} did not start within ${this.startupTimeoutMs}ms: ${this.lastError || this.stderrTail}`);
+    }, this.startupTimeoutMs);
+
+    child.stdout.on('data', (chunk) => {
+      if (this.child !== child) {
+        return;
+      }
+      this.stdoutBuffer += chunk.toString();
+      let newlineIndex: number;
+      while ((newlineIndex = this.stdoutBuffer.indexOf('\n')) !== -1) {
+        const line = this.stdoutBuffer.slice(0, newlineIndex);
+        this.stdoutBuffer = this.stdoutBuffer.slice(newlineIndex + 1);
+        this.handleLine(line);
+      }
+    });
+
+    child.stderr.on('data', (chunk) => {
+      if (this.child !== child) {
+        return;
+      }
+      // Keep only the tail - libraries can be chatty on stderr
+      this.stderrTail = (this.stderrTail + chunk.toString()).slice(-2000);
+    });
+
+    // Events from a process that was already replaced (e.g. killed after a timeout) are ignored
+    child.on('error', (error) => {
+      if (this.child !== child) {
+        return;
+      }
+      this.clearStartupTimer();
+      this.failPending(`${this.label} process failed: ${error.message}`);
+      this.child = null;
+    });
+
+    child.on('close', (code) => {
+      if (this.child !== child) {
+        return;
+      }
+      this.clearStartupTimer();
+      this.failPending(`${this.label} exited with code ${code}: ${this.lastError || this.stderrTail}`);
+      this.child = null;
+    });
+
+    // Writes after the worker died surface through 'close'; just avoid an unhandled error
+    child.stdin.on('error', (error) => {
+      logger.debug({ error: error.message, worker: this.label }, 'Python worker stdin error');
+    });
+
+    this.child = child;
+    logger.debug({ worker: this.label, modelType: this.modelType }, 'Started Python worker');
+    return child;
+  }
+
+  private handleLine(line: string): void {
+    // Remove ANSI escape codes and clean the output
+    const cleanLine = line
+      .replace(/\u001b\[[0-9;]*m/g, '')
+      .replace(/\u001b\[K/g, '')
+      .replace(/\r/g, '')
+      .trim();
+
+    if (!cleanLine) {
+      return;
+    }
+
+    let message: any;
+    try {
+      message = JSON.parse(cleanLine);
+    } catch {
+      logger.debug({ worker: this.label, line: cleanLine.substring(0, 200) }, 'Ignoring non-JSON worker output');
+      return;
+    }
+
+    const id = typeof message.id === 'number' ? message.id : null;
+    const pending = id !== null ? this.pending.get(id) : undefined;
+
+    if (!pending) {
+      // Startup messages (ready / load errors) are not tied to a request
+      if (message.ready) {
+        // Model is loaded - start the clocks for requests queued during startup
+        this.ready = true;
+        this.clearStartupTimer();
+        this.pending.forEach((queued) => this.startRequestTimer(queued));
+      }
+      if (message.error) {
+        this.lastError = message.error;
+      }
+      return;
+    }
+
+    this.pending.delete(id as number);
+    if (pending.timer) {
+      clearTimeout(pending.timer);
+    }
+    delete message.id;
+    pending.resolve(message);
+  }
+
+  private failPending(message: string): void {
+    const error = new Error(message);
+    this.pending.forEach(({ reject, timer }) => {
+      if (timer) {
+        clearTimeout(timer);
+      }
+      reject(error);
+    });
+    this.pending.clear();
+  }
+}
@@ -1,8 +1,8 @@
 import { FrameAnalysis } from '@/types/vision';
 import * as fs from 'fs-extra';
-import { spawn } from 'child_process';
 import path from 'path';
 import logger from '@/utils/logger';
+import { PythonWorker } from '@/lib/ai/python-worker';
 
 /**
  * Object class names that might indicate brands/products
@@ -36,11 +36,16 @@ class VisionModel {
   private yoloScriptPath: string;
   private ocrScriptPath: string;
   private clipScriptPath: string;
+  private yoloWorker: PythonWorker;
+  private ocrWorker: PythonWorker;
+  private clipWorker: PythonWorker;
+  private ocrPreprocess: boolean;
   private yoloAvailable: boolean | null = null;
   private ocrAvailable: boolean | null = null;
   private clipAvailable: boolean | null = null;
   private referenceEmbeddingPath: string | null = null; // Path to saved reference embedding JSON (deprecated, use referenceEmbeddingPaths)
   private referenceEmbeddingPaths: string[] = []; // Paths to saved reference embedding JSON files
+  private referenceBankPath: string | null = null; // Path to saved reference bank (.npy, one row per reference image)
 
   constructor() {
     // Use Python command from env or default to venv Python
@@ -52,6 +57,17 @@ class VisionModel {
     this.yoloScriptPath = path.join(process.cwd(), 'yolo', 'detect.py');
     this.ocrScriptPath = path.join(process.cwd(), 'yolo', 'ocr.py');
     this.clipScriptPath = path.join(process.cwd(), 'yolo', 'clip_similarity.py');
+
+    // Opt-in OCR preprocessing (grayscale, 2x upscale, Otsu binarization)
+    this.ocrPreprocess = process.env.OCR_PREPROCESS === 'true';
+
+    // One long-lived worker per model type so weights are loaded once, not per frame
+    // A hung worker is killed and respawned after PYTHON_WORKER_TIMEOUT_MS (counted once the model is loaded)
+    const workerScriptPath = path.join(process.cwd(), 'yolo', 'worker.py');
+    const workerTimeoutMs = Number(process.env.PYTHON_WORKER_TIMEOUT_MS) || undefined;
+    this.yoloWorker = new PythonWorker('YOLO', this.pythonCommand, workerScriptPath, 'detect', workerTimeoutMs);
+    this.ocrWorker = new PythonWorker('OCR', this.pythonCommand, workerScriptPath, 'ocr', workerTimeoutMs);
+    this.clipWorker = new PythonWorker('CLIP', this.pythonCommand, workerScriptPath, 'clip', workerTimeoutMs);
   }
 
   /**
@@ -90,63 +106,14 @@ class VisionModel {
   }
 
   /**
-   * Run YOLO detection via Python subprocess
+   * Run YOLO detection via the persistent Python worker
    */
-  private async runYoloCommand(args: string[]): Promise<string[]> {
-    return new Promise((resolve, reject) => {
-      const scriptArgs = [this.yoloScriptPath, ...args];
-      
-      const child = spawn(this.pythonCommand, scriptArgs, {
-        cwd: process.cwd(),
-        env: process.env,
-        shell: process.platform === 'win32',
-      });
-
-      let stdout = '';
-      let stderr = '';
-
-      child.stdout.on('data', (chunk) => {
-        stdout += chunk.toString();
-      });
-
-      child.stderr.on('data', (chunk) => {
-        stderr += chunk.toString();
-      });
-
-      child.on('error', (error) => {
-        reject(new Error(`YOLO process failed: ${error.message}`));
-      });
-
-      child.on('close', (code) => {
-        if (code !== 0) {
-          reject(new Error(`YOLO exited with code ${code}: ${stderr || stdout}`));
-          return;
-        }
-
-        try {
-          // Remove ANSI escape codes and clean the output
-          const cleanOutput = stdout
-            .replace(/\u001b\[[0-9;]*m/g, '') // Remove ANSI color codes
-            .replace(/\u001b\[K/g, '') // Remove clear line codes
-            .replace(/\r/g, '') // Remove carriage returns
-            .trim();
-          
-          // Extract JSON from output (in case there's extra text)
-          const jsonMatch = cleanOutput.match(/\{[\s\S]*\}/);
-          const jsonString = jsonMatch ? jsonMatch[0] : cleanOutput;
-          
-          const result = JSON.parse(jsonString);
-          if (result.error) {
-            reject(new Error(result.error));
-            return;
-          }
-          resolve(result.objects || []);
-        } catch (parseError: any) {
-          logger.debug({ stdout, stderr, parseError: parseError.message }, 'YOLO output parsing failed');
-          reject(new Error(`Failed to parse YOLO output: ${parseError.message}. Output: ${stdout.substring(0, 200)}`));
-        }
-      });
-    });
+  private async runYoloCommand(imagePath: string, confidence: number): Promise<string[]> {
+    const result = await this.yoloWorker.request({ op: 'detect', image_path: imagePath, confidence });
+    if (result.error) {
+      throw new Error(result.error);
+    }
+    return result.objects || [];
   }
 
   isConfigured(): boolean {
@@ -155,27 +122,104 @@ class VisionModel {
 
   /**
    * Set multiple reference product images for CLIP similarity matching
+   * All references are embedded in one batch and stored as a single bank, so each frame
+   * is compared against every reference in one call.
    * @param referenceImagePaths Array of paths to reference product images
-   * @returns Array of paths to saved embedding JSON files
+   * @returns Array of reference image paths included in the bank
    */
   async setReferenceImages(referenceImagePaths: string[]): Promise<string[]> {
-    const embeddingPaths: string[] = [];
-    
+    if (!(await fs.pathExists(this.clipScriptPath))) {
+      logger.warn('CLIP script not found - visual similarity will be disabled');
+      this.clipAvailable = false;
+      return [];
+    }
+
+    const absolutePaths: string[] = [];
     for (const referenceImagePath of referenceImagePaths) {
-      const embeddingPath = await this.setReferenceImage(referenceImagePath);
-      if (embeddingPath) {
-        embeddingPaths.push(embeddingPath);
+      // Normalize path to absolute
+      const absolutePath = path.isAbsolute(referenceImagePath)
+        ? referenceImagePath
+        : path.resolve(process.cwd(), referenceImagePath);
+
+      if (!(await fs.pathExists(absolutePath))) {
+        logger.warn({ referenceImagePath }, 'Reference image file does not exist');
+        continue;
       }
+      absolutePaths.push(absolutePath);
     }
-    
-    this.referenceEmbeddingPaths = embeddingPaths;
-    
-    if (embeddingPaths.length > 0) {
+
+    if (absolutePaths.length === 0) {
+      this.clipAvailable = false;
+      return [];
+    }
+
+    try {
+      logger.info({ count: absolutePaths.length }, 'Generating CLIP reference bank for reference images');
+
+      const tempDir = path.join(process.cwd(), 'storage', 'temp');
+      await fs.ensureDir(tempDir);
+      const bankPath = path.join(tempDir, `ref_bank_${Date.now()}.npy`);
+
+      const bankResult = await this.runClipCommand({ op: 'bank', image_paths: absolutePaths, output_path: bankPath });
+
+      if (bankResult.error) {
+        logger.error({ 
+          error: bankResult.error,
+          count: absolutePaths.length 
+        }, 'Failed to generate reference bank - CLIP dependencies may not be installed');
+        logger.info('To enable CLIP visual similarity, install dependencies: pip install -r yolo/requirements_clip.txt');
+        this.clipAvailable = false;
+        return [];
+      }
+
+      // Images that failed to embed are left out; bank rows follow the kept indices
+      const includedPaths: string[] = (bankResult.indices as number[]).map((index) => absolutePaths[index]);
+      Object.entries(bankResult.errors || {}).forEach(([referenceImagePath, error]) => {
+        logger.warn({ referenceImagePath, error }, 'Failed to generate embedding for reference image - skipping');
+      });
+
+      await this.removeReferenceBank();
+      this.referenceBankPath = bankPath;
       this.clipAvailable = true;
-      logger.info({ count: embeddingPaths.length }, `Set ${embeddingPaths.length} reference image(s) for CLIP similarity`);
+      logger.info({ 
+        bankPath,
+        count: bankResult.count,
+        embeddingDimension: bankResult.dimension 
+      }, `Set ${includedPaths.length} reference image(s) for CLIP similarity`);
+
+      return includedPaths;
+    } catch (error: any) {
+      const errorMsg = error?.message || 'Unknown error';
+      logger.error({ 
+        error: errorMsg,
+        count: absolutePaths.length 
+      }, 'CLIP reference bank setup failed');
+
+      // Check if it's a dependency issue
+      if (errorMsg.includes('dependencies not installed') || errorMsg.includes('CLIP exited with code')) {
+        logger.info('CLIP dependencies are not installed. Install with: pip install -r yolo/requirements_clip.txt');
+      }
+
+      this.clipAvailable = false;
+      return [];
+    }
+  }
+
+  /**
+   * Delete the current reference bank file (a new one is written every time the references change)
+   */
+  private async removeReferenceBank(): Promise<void> {
+    if (!this.referenceBankPath) {
+      return;
+    }
+
+    const bankPath = this.referenceBankPath;
+    this.referenceBankPath = null;
+    try {
+      await fs.remove(bankPath);
+    } catch (error: any) {
+      logger.debug({ error: error?.message, bankPath }, 'Failed to remove previous reference bank');
     }
-    
-    return embeddingPaths;
   }
 
   /**
@@ -205,7 +249,7 @@ class VisionModel {
       logger.info({ referenceImagePath: absolutePath }, 'Generating CLIP embedding for reference image');
       
       // Generate embedding and save to temp file
-      const embeddingResult = await this.runClipCommand(['embed', absolutePath]);
+      const embeddingResult = await this.runClipCommand({ op: 'embed', image_path: absolutePath });
       
       if (embeddingResult.error) {
         logger.error({ 
@@ -224,6 +268,8 @@ class VisionModel {
       await fs.writeJSON(embeddingPath, embeddingResult);
 
       // Update both single and array for backward compatibility
+      // A single reference replaces any previously generated bank
+      await this.removeReferenceBank();
       this.referenceEmbeddingPath = embeddingPath;
       if (!this.referenceEmbeddingPaths.includes(embeddingPath)) {
         this.referenceEmbeddingPaths.push(embeddingPath);
@@ -263,6 +309,10 @@ class VisionModel {
       return null; // CLIP was disabled due to errors
     }
 
+    if (this.referenceBankPath) {
+      return this.matchReferenceBank(framePath, this.referenceBankPath);
+    }
+
     // Use multiple reference images if available, otherwise fall back to single
     const embeddingPaths = this.referenceEmbeddingPaths.length > 0 
       ? this.referenceEmbeddingPaths 
@@ -288,7 +338,7 @@ class VisionModel {
         }
 
         try {
-          const result = await this.runClipCommand(['compare', absoluteFramePath, embeddingPath]);
+          const result = await this.runClipCommand({ op: 'compare', frame_path: absoluteFramePath, embedding_path: embeddingPath });
           
           if (result.error) {
             logger.debug({ error: result.error, framePath, referenceIndex: i }, 'CLIP similarity computation failed for reference image');
@@ -346,63 +396,59 @@ class VisionModel {
   }
 
   /**
-   * Run CLIP command via Python subprocess
+   * Compare a frame against every reference in the bank with a single CLIP call
+   * @param framePath Path to frame image
+   * @param bankPath Path to reference bank (.npy)
+   * @returns Best match across all reference images, or null if unavailable
    */
-  private async runClipCommand(args: string[]): Promise<any> {
-    return new Promise((resolve, reject) => {
-      const scriptArgs = [this.clipScriptPath, ...args];
-      
-      const child = spawn(this.pythonCommand, scriptArgs, {
-        cwd: process.cwd(),
-        env: process.env,
-        shell: process.platform === 'win32',
-      });
-
-      let stdout = '';
-      let stderr = '';
+  private async matchReferenceBank(framePath: string, bankPath: string): Promise<{ similarity: number; match: boolean; confidence: 'high' | 'medium' | 'low' | 'none'; referenceImageIndex?: number } | null> {
+    try {
+      const absoluteFramePath = path.isAbsolute(framePath)
+        ? framePath
+        : path.resolve(process.cwd(), framePath);
 
-      child.stdout.on('data', (chunk) => {
-        stdout += chunk.toString();
-      });
+      const result = await this.runClipCommand({ op: 'match', frame_path: absoluteFramePath, bank_path: bankPath });
 
-      child.stderr.on('data', (chunk) => {
-        stderr += chunk.toString();
-      });
+      if (result.error) {
+        logger.debug({ error: result.error, framePath }, 'CLIP similarity computation failed for reference bank');
+        return null;
+      }
 
-      child.on('error', (error) => {
-        reject(new Error(`CLIP process failed: ${error.message}`));
-      });
+      logger.debug({ 
+        framePath: path.basename(framePath),
+        similarity: result.similarity,
+        match: result.match,
+        confidence: result.confidence,
+        referenceImageIndex: result.referenceIndex,
+        totalReferences: result.similarities?.length
+      }, 'CLIP similarity computed (best match across all reference images)');
 
-      child.on('close', (code) => {
-        if (code !== 0) {
-          reject(new Error(`CLIP exited with code ${code}: ${stderr || stdout}`));
-          return;
-        }
+      return {
+        similarity: result.similarity,
+        match: result.match,
+        confidence: result.confidence,
+        referenceImageIndex: result.referenceIndex,
+      };
+    } catch (error: any) {
+      logger.debug({ error: error?.message, framePath }, 'CLIP similarity failed');
+      // Mark CLIP as unavailable on error
+      if (error?.message?.includes('dependencies not installed') || error?.message?.includes('CLIP exited')) {
+        this.clipAvailable = false;
+      }
+      return null;
+    }
+  }
 
-        try {
-          // Remove ANSI escape codes and clean the output
-          const cleanOutput = stdout
-            .replace(/\u001b\[[0-9;]*m/g, '')
-            .replace(/\u001b\[K/g, '')
-            .replace(/\r/g, '')
-            .trim();
-          
-          // Extract JSON from output
-          const jsonMatch = cleanOutput.match(/\{[\s\S]*\}/);
-          const jsonString = jsonMatch ? jsonMatch[0] : cleanOutput;
-          
-          const result = JSON.parse(jsonString);
-          if (result.error) {
-            resolve({ error: result.error });
-            return;
-          }
-          resolve(result);
-        } catch (parseError: any) {
-          logger.debug({ stdout, stderr, parseError: parseError.message }, 'CLIP output parsing failed');
-          reject(new Error(`Failed to parse CLIP output: ${parseError.message}. Output: ${stdout.substring(0, 200)}`));
-        }
-      });
-    });
+  /**
+   * Run CLIP command via the persistent Python worker
+   * Errors reported by the worker are returned as { error } rather than thrown
+   */
+  private async runClipCommand(request: Record<string, unknown>): Promise<any> {
+    const result = await this.clipWorker.request(request);
+    if (result.error) {
+      return { error: result.error };
+    }
+    return result;
   }
 
   /**
@@ -571,7 +617,7 @@ class VisionModel {
 
       // Always attempt YOLO detection with higher confidence threshold for accuracy
       // Increased from 0.4 to 0.5 to reduce false positives
-      const objects = await this.runYoloCommand([absolutePath, '0.5']);
+      const objects = await this.runYoloCommand(absolutePath, 0.5);
       
       // Mark as available if successful
       if (this.yoloAvailable !== true) {
@@ -628,7 +674,7 @@ class VisionModel {
       }
 
       // Always attempt OCR
-      const text = await this.runOcrCommand([absolutePath]);
+      const text = await this.runOcrCommand(absolutePath);
       
       // Mark as available if successful
       if (this.ocrAvailable !== true) {
@@ -666,63 +712,14 @@ class VisionModel {
   }
 
   /**
-   * Run OCR detection via Python subprocess
+   * Run OCR detection via the persistent Python worker
    */
-  private async runOcrCommand(args: string[]): Promise<string> {
-    return new Promise((resolve, reject) => {
-      const scriptArgs = [this.ocrScriptPath, ...args];
-      
-      const child = spawn(this.pythonCommand, scriptArgs, {
-        cwd: process.cwd(),
-        env: process.env,
-        shell: process.platform === 'win32',
-      });
-
-      let stdout = '';
-      let stderr = '';
-
-      child.stdout.on('data', (chunk) => {
-        stdout += chunk.toString();
-      });
-
-      child.stderr.on('data', (chunk) => {
-        stderr += chunk.toString();
-      });
-
-      child.on('error', (error) => {
-        reject(new Error(`OCR process failed: ${error.message}`));
-      });
-
-      child.on('close', (code) => {
-        if (code !== 0) {
-          reject(new Error(`OCR exited with code ${code}: ${stderr || stdout}`));
-          return;
-        }
-
-        try {
-          // Remove ANSI escape codes and clean the output
-          const cleanOutput = stdout
-            .replace(/\u001b\[[0-9;]*m/g, '') // Remove ANSI color codes
-            .replace(/\u001b\[K/g, '') // Remove clear line codes
-            .replace(/\r/g, '') // Remove carriage returns
-            .trim();
-          
-          // Extract JSON from output (in case there's extra text)
-          const jsonMatch = cleanOutput.match(/\{[\s\S]*\}/);
-          const jsonString = jsonMatch ? jsonMatch[0] : cleanOutput;
-          
-          const result = JSON.parse(jsonString);
-          if (result.error) {
-            reject(new Error(result.error));
-            return;
-          }
-          resolve(result.text || '');
-        } catch (parseError: any) {
-          logger.debug({ stdout, stderr, parseError: parseError.message }, 'OCR output parsing failed');
-          reject(new Error(`Failed to parse OCR output: ${parseError.message}. Output: ${stdout.substring(0, 200)}`));
-        }
-      });
-    });
+  private async runOcrCommand(imagePath: string): Promise<string> {
+    const result = await this.ocrWorker.request({ op: 'ocr', image_path: imagePath, preprocess: this.ocrPreprocess });
+    if (result.error) {
+      throw new Error(result.error);
+    }
+    return result.text || '';
   }
 
   /**
@@ -3,33 +3,181 @@
 CLIP Visual Similarity Script
 Uses OpenAI CLIP to compute visual similarity between a reference product image and video frames
 """
+import hashlib
 import json
 import sys
 import os
-from pathlib import Path
+from collections import OrderedDict
 
 # Suppress warnings
 import warnings
 warnings.filterwarnings('ignore')
 
 try:
+    import numpy as np
     import torch
     import clip
-    from PIL import Image
+    import torch.nn.functional as F
+    from torch.utils.data import DataLoader, Dataset
+    from image_io import load_rgb, load_rgb_array
+    from model_config import CLIP_ONNX_PATH, IMAGE_EXTENSIONS, select_onnx_path
 except ImportError:
-    print(json.dumps({"error": "CLIP dependencies not installed. Run: pip install torch torchvision pillow ftfy"}))
+    print(json.dumps({"error": "CLIP dependencies not installed. Run: pip install torch torchvision pillow ftfy numpy"}))
     sys.exit(1)
 
+# ONNX Runtime is optional - used when an exported visual encoder is present (see export.py)
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+# CLIP input resolution and normalization constants (ViT-B/32)
+CLIP_INPUT_SIZE = 224
+CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
+
+# Batched embedding settings
+EMBED_BATCH_SIZE = 32
+EMBED_NUM_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class OnnxVisualEncoder:
+    """
+    CLIP image tower running on ONNX Runtime
+    Exposes the encode_image interface used by encode_images
+    """
+    def __init__(self, onnx_path: str):
+        # Only used on CPU-only hosts (see load_clip_model)
+        self.session = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+    
+    def encode_image(self, image_tensor):
+        inputs = {self.input_name: image_tensor.cpu().numpy().astype(np.float32)}
+        return torch.from_numpy(self.session.run(None, inputs)[0])
+
+
+def _convert_to_rgb(image):
+    return image.convert('RGB')
+
+
+def build_preprocess():
+    """CLIP's image preprocessing (resize, center crop, normalize) without loading the model"""
+    from torchvision.transforms import CenterCrop, Compose, InterpolationMode, Normalize, Resize, ToTensor
+    
+    return Compose([
+        Resize(CLIP_INPUT_SIZE, interpolation=InterpolationMode.BICUBIC),
+        CenterCrop(CLIP_INPUT_SIZE),
+        _convert_to_rgb,
+        ToTensor(),
+        Normalize(CLIP_MEAN, CLIP_STD),
+    ])
+
+
+class GpuPreprocess:
+    """
+    CLIP preprocessing on the GPU (resize shortest side, center crop, normalize)
+    Takes raw (H, W, 3) uint8 tensors so the CPU only has to decode the image
+    """
+    def __init__(self, device: str):
+        self.device = device
+        self.mean = torch.tensor(CLIP_MEAN, device=device).view(1, 3, 1, 1)
+        self.std = torch.tensor(CLIP_STD, device=device).view(1, 3, 1, 1)
+    
+    def __call__(self, raw_image):
+        image = raw_image.to(self.device, non_blocking=True).permute(2, 0, 1).unsqueeze(0).float().div_(255)
+        
+        # Resize the shortest side to 224 (bicubic, like CLIP's PIL pipeline), then center crop
+        height, width = image.shape[-2:]
+        scale = CLIP_INPUT_SIZE / min(height, width)
+        new_height = max(CLIP_INPUT_SIZE, round(height * scale))
+        new_width = max(CLIP_INPUT_SIZE, round(width * scale))
+        image = F.interpolate(image, size=(new_height, new_width), mode='bicubic', align_corners=False, antialias=True)
+        top = (new_height - CLIP_INPUT_SIZE) // 2
+        left = (new_width - CLIP_INPUT_SIZE) // 2
+        image = image[..., top:top + CLIP_INPUT_SIZE, left:left + CLIP_INPUT_SIZE]
+        
+        # Bicubic overshoots; clamp like the uint8 PIL path before normalizing
+        return (image.clamp_(0, 1) - self.mean) / self.std
+
+
+def preprocess_image(preprocess, image_path: str):
+    """
+    Load and preprocess a single image into a (1, 3, 224, 224) tensor
+    
+    Args:
+        preprocess: CLIP preprocess (PIL-based transform or GpuPreprocess)
+        image_path: Path to the image file
+    """
+    if isinstance(preprocess, GpuPreprocess):
+        return preprocess(torch.from_numpy(load_rgb_array(image_path)))
+    return preprocess(load_rgb(image_path)).unsqueeze(0)
+
+
+# torch.compile the visual tower on CUDA (set CLIP_COMPILE=0 to disable)
+CLIP_COMPILE = os.environ.get('CLIP_COMPILE', '1') != '0'
+
+
+# Batch sizes the compiled visual tower is specialized for: single images and full batches.
+# Other batches are zero-padded up to one of these, so no request triggers a recompile
+COMPILED_BATCH_SIZES = (1, EMBED_BATCH_SIZE)
+
+
+def compile_visual(model, device: str):
+    """
+    Compile the CLIP visual tower into fused kernels (CUDA graphs via reduce-overhead)
+    Runs a warm-up pass per batch size in COMPILED_BATCH_SIZES so compilation happens at load
+    time, not on the first request. Falls back to eager mode if compilation is unavailable.
+    """
+    if not hasattr(torch, 'compile'):
+        return model
+    
+    eager_visual = model.visual
+    try:
+        model.visual = torch.compile(eager_visual, mode='reduce-overhead', fullgraph=True, dynamic=False)
+        with torch.inference_mode():
+            for batch_size in COMPILED_BATCH_SIZES:
+                dummy_input = torch.zeros(batch_size, 3, CLIP_INPUT_SIZE, CLIP_INPUT_SIZE, device=device, dtype=model.dtype)
+                model.encode_image(dummy_input)
+        model.visual_compiled = True
+    except Exception:
+        model.visual = eager_visual
+    
+    return model
+
+
+def _pad_to_compiled_batch(image_tensor):
+    """Zero-pad a batch to the nearest compiled batch size (unchanged if it is larger than all)"""
+    batch_size = image_tensor.shape[0]
+    target = next((size for size in COMPILED_BATCH_SIZES if size >= batch_size), batch_size)
+    if target == batch_size:
+        return image_tensor
+    padding = image_tensor.new_zeros((target - batch_size, *image_tensor.shape[1:]))
+    return torch.cat([image_tensor, padding])
+
 
 def load_clip_model():
     """
     Load CLIP model (ViT-B/32)
+    On CPU-only hosts uses the exported ONNX visual encoder if available; on CUDA always uses
+    the PyTorch model (FP16, GPU preprocessing, torch.compile, device-resident embeddings)
     Returns model and preprocess function
     """
     try:
         device = "cuda" if torch.cuda.is_available() else "cpu"
+        
+        if device == "cpu" and ort is not None and os.path.exists(CLIP_ONNX_PATH):
+            # Inputs stay on CPU in FP32
+            return OnnxVisualEncoder(select_onnx_path(CLIP_ONNX_PATH, device)), build_preprocess(), "cpu"
+        
         model, preprocess = clip.load("ViT-B/32", device=device)
+        if device == "cuda":
+            # FP16 halves memory and runs on tensor cores; CPU stays FP32
+            model = model.half()
+            # Resize/normalize on the GPU instead of PIL on the CPU
+            preprocess = GpuPreprocess(device)
         model.eval()
+        if device == "cuda" and CLIP_COMPILE:
+            model = compile_visual(model, device)
         return model, preprocess, device
     except Exception as e:
         return {"error": f"Failed to load CLIP model: {str(e)}"}
@@ -54,6 +202,62 @@ def get_model():
     return _model_cache, _preprocess_cache, _device_cache
 
 
+def encode_images(model, image_tensor, device: str):
+    """
+    Run the CLIP image encoder and L2-normalize the result
+    
+    Args:
+        model: Loaded CLIP model
+        image_tensor: Preprocessed image batch of shape (N, 3, 224, 224)
+        device: Device the model lives on
+    
+    Returns:
+        Unit-norm FP32 embeddings of shape (N, D)
+    """
+    image_tensor = image_tensor.to(device, non_blocking=True)
+    if device == "cuda":
+        image_tensor = image_tensor.half()
+    
+    batch_size = image_tensor.shape[0]
+    if getattr(model, 'visual_compiled', False):
+        # Keep the compiled graph on a shape it was warmed up with; padded rows are dropped below
+        image_tensor = _pad_to_compiled_batch(image_tensor)
+    
+    with torch.inference_mode():
+        embeddings = model.encode_image(image_tensor)[:batch_size]
+        # Normalize in FP32 for a numerically stable unit vector
+        embeddings = embeddings.float()
+        embeddings = embeddings / embeddings.norm(dim=-1, keepdim=True)
+    
+    return embeddings
+
+
+# LRU cache of embeddings keyed by image content hash - repeated/identical frames
+# (e.g. static shots sampled at 1 fps) skip the forward pass entirely
+EMBEDDING_CACHE_SIZE = 4096
+_embedding_cache = OrderedDict()
+
+
+def content_hash(image_path: str):
+    """Hash of the image file bytes (cache key)"""
+    with open(image_path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).digest()
+
+
+def _get_cached_embedding(key: bytes):
+    embedding = _embedding_cache.get(key)
+    if embedding is not None:
+        _embedding_cache.move_to_end(key)
+    return embedding
+
+
+def _cache_embedding(key: bytes, embedding):
+    _embedding_cache[key] = embedding
+    _embedding_cache.move_to_end(key)
+    if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+        _embedding_cache.popitem(last=False)
+
+
 def embed_image(image_path: str):
     """
     Generate CLIP embedding for an image
@@ -62,7 +266,7 @@ def embed_image(image_path: str):
         image_path: Path to the image file
     
     Returns:
-        Image embedding tensor or error dict
+        Image embedding tensor (on the model's device) or error dict
     """
     try:
         model, preprocess, device = get_model()
@@ -70,21 +274,184 @@ def embed_image(image_path: str):
         if isinstance(model, dict):
             return model  # Return error
         
+        key = content_hash(image_path)
+        cached = _get_cached_embedding(key)
+        if cached is not None:
+            return cached.unsqueeze(0)
+        
         # Load and preprocess image
-        image = Image.open(image_path).convert('RGB')
-        image_tensor = preprocess(image).unsqueeze(0).to(device)
+        image_tensor = preprocess_image(preprocess, image_path)
         
-        # Generate embedding
-        with torch.no_grad():
-            embedding = model.encode_image(image_tensor)
-            # Normalize embedding for cosine similarity
-            embedding = embedding / embedding.norm(dim=-1, keepdim=True)
+        # Generate normalized embedding (kept on device for the following similarity op)
+        embedding = encode_images(model, image_tensor, device)
+        _cache_embedding(key, embedding.squeeze(0))
         
-        return embedding.cpu().float()
+        return embedding
     except Exception as e:
         return {"error": f"Failed to embed image: {str(e)}"}
 
 
+def embed_image_cpu(image_path: str):
+    """
+    Generate CLIP embedding for an image, copied to CPU (for serialization)
+    
+    Args:
+        image_path: Path to the image file
+    
+    Returns:
+        Image embedding tensor on CPU or error dict
+    """
+    embedding = embed_image(image_path)
+    if isinstance(embedding, dict):
+        return embedding
+    return embedding.cpu()
+
+
+def model_device():
+    """Device embeddings live on ("cpu" if the model failed to load)"""
+    result = get_model()
+    return "cpu" if isinstance(result, dict) else result[2]
+
+
+# Stricter thresholds for product matching
+# Base threshold increased to reduce false positives
+MATCH_THRESHOLD = 0.40   # Minimum similarity to consider a match
+HIGH_THRESHOLD = 0.50    # High confidence threshold
+MEDIUM_THRESHOLD = 0.45  # Medium confidence threshold
+
+
+def score_similarity(similarity: float):
+    """
+    Convert a raw cosine similarity into the match/confidence result
+    
+    Args:
+        similarity: Cosine similarity in [-1, 1]
+    
+    Returns:
+        Dict with similarity, match and confidence
+    """
+    # Clamp to [0, 1] range (though cosine similarity is already in [-1, 1])
+    # For product matching, we're interested in positive similarity
+    similarity = max(0.0, similarity)
+    
+    is_match = similarity >= MATCH_THRESHOLD
+    confidence = "high" if similarity >= HIGH_THRESHOLD else "medium" if similarity >= MEDIUM_THRESHOLD else "low" if is_match else "none"
+    
+    return {
+        "similarity": float(similarity),
+        "match": is_match,
+        "confidence": confidence
+    }
+
+
+class FrameDataset(Dataset):
+    """
+    Decodes and preprocesses frames (runs in DataLoader worker processes)
+    Without a CPU preprocess, yields raw (H, W, 3) uint8 tensors for GpuPreprocess
+    """
+    def __init__(self, image_paths: list, preprocess=None):
+        self.image_paths = image_paths
+        self.preprocess = preprocess
+    
+    def __len__(self):
+        return len(self.image_paths)
+    
+    def __getitem__(self, index):
+        if self.preprocess is None:
+            return torch.from_numpy(load_rgb_array(self.image_paths[index]))
+        return self.preprocess(load_rgb(self.image_paths[index]))
+
+
+def _collate_raw(images):
+    # Raw frames differ in size, so keep them as a list
+    return images
+
+
+def _embed_batched(model, preprocess, device: str, image_paths: list):
+    """
+    Embed images in batched forward passes
+    Image decoding/preprocessing runs in DataLoader workers, overlapping with inference
+    
+    Returns:
+        Normalized embedding tensor of shape (N, D) on the model's device
+    """
+    gpu_preprocess = isinstance(preprocess, GpuPreprocess)
+    
+    # Worker processes only pay off once there is more than one batch to prefetch
+    num_workers = EMBED_NUM_WORKERS if len(image_paths) > EMBED_BATCH_SIZE else 0
+    loader = DataLoader(
+        FrameDataset(image_paths, None if gpu_preprocess else preprocess),
+        batch_size=EMBED_BATCH_SIZE,
+        num_workers=num_workers,
+        collate_fn=_collate_raw if gpu_preprocess else None,
+        pin_memory=(device == "cuda"),
+        prefetch_factor=2 if num_workers > 0 else None,
+    )
+    
+    embeddings = []
+    for batch in loader:
+        if gpu_preprocess:
+            batch = torch.cat([preprocess(raw_image) for raw_image in batch])
+        embeddings.append(encode_images(model, batch, device))
+    
+    return torch.cat(embeddings)
+
+
+def embed_images(image_paths: list):
+    """
+    Generate CLIP embeddings for several images in batched forward passes
+    Images already in the content-hash cache are not re-embedded
+    
+    Args:
+        image_paths: Paths to image files
+    
+    Returns:
+        Normalized embedding tensor of shape (N, D) (on the model's device) or error dict
+    """
+    try:
+        model, preprocess, device = get_model()
+        
+        if isinstance(model, dict):
+            return model  # Return error
+        
+        keys = [content_hash(image_path) for image_path in image_paths]
+        embeddings = {key: _get_cached_embedding(key) for key in keys}
+        
+        # Embed each distinct uncached image once
+        missing = {key: image_path for key, image_path in zip(keys, image_paths) if embeddings[key] is None}
+        if missing:
+            new_embeddings = _embed_batched(model, preprocess, device, list(missing.values()))
+            for key, embedding in zip(missing.keys(), new_embeddings):
+                # Clone so cached rows don't keep the whole batch tensor alive
+                embeddings[key] = embedding.clone()
+                _cache_embedding(key, embeddings[key])
+        
+        return torch.stack([embeddings[key] for key in keys])
+    except Exception as e:
+        return {"error": f"Failed to embed images: {str(e)}"}
+
+
+def list_frame_images(frames_dir: str):
+    """List image files in a directory (sorted by name)"""
+    return [
+        os.path.join(frames_dir, name)
+        for name in sorted(os.listdir(frames_dir))
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+# Verify reference embeddings are unit-norm before each compare (set CLIP_DEBUG=1).
+# Off by default: the check costs an extra kernel and a device sync per call
+CLIP_DEBUG = os.environ.get('CLIP_DEBUG', '0') == '1'
+
+
+def _check_unit_norm(embedding):
+    """Debug check that embeddings are L2-normalized (only when CLIP_DEBUG=1)"""
+    if not CLIP_DEBUG:
+        return
+    assert torch.allclose(embedding.norm(dim=-1), torch.ones(1, device=embedding.device), atol=1e-3), "Embedding is not unit-norm"
+
+
 def compute_similarity(reference_image_path: str, frame_image_path: str):
     """
     Compute cosine similarity between reference image and frame
@@ -106,27 +473,10 @@ def compute_similarity(reference_image_path: str, frame_image_path: str):
         if isinstance(frame_embedding, dict) and "error" in frame_embedding:
             return frame_embedding
         
-        # Compute cosine similarity
-        similarity = torch.cosine_similarity(ref_embedding, frame_embedding).item()
-        
-        # Clamp to [0, 1] range (though cosine similarity is already in [-1, 1])
-        # For product matching, we're interested in positive similarity
-        similarity = max(0.0, similarity)
-        
-        # Stricter thresholds for product matching
-        # Base threshold increased to reduce false positives
-        match_threshold = 0.40  # Minimum similarity to consider a match
-        high_threshold = 0.50   # High confidence threshold
-        medium_threshold = 0.45 # Medium confidence threshold
+        # Embeddings are unit-norm, so cosine similarity is a plain dot product
+        similarity = (ref_embedding * frame_embedding).sum().item()
         
-        is_match = similarity >= match_threshold
-        confidence = "high" if similarity >= high_threshold else "medium" if similarity >= medium_threshold else "low" if is_match else "none"
-        
-        return {
-            "similarity": float(similarity),
-            "match": is_match,
-            "confidence": confidence
-        }
+        return score_similarity(similarity)
     except Exception as e:
         return {"error": f"Failed to compute similarity: {str(e)}"}
 
@@ -142,7 +492,7 @@ def embed_reference(reference_image_path: str):
         Embedding tensor serialized as list or error dict
     """
     try:
-        embedding = embed_image(reference_image_path)
+        embedding = embed_image_cpu(reference_image_path)
         
         if isinstance(embedding, dict) and "error" in embedding:
             return embedding
@@ -158,13 +508,13 @@ def embed_reference(reference_image_path: str):
         return {"error": f"Failed to embed reference image: {str(e)}"}
 
 
-def compare_with_embedding(frame_image_path: str, reference_embedding_list: list):
+def compare_with_embedding(frame_image_path: str, reference_embedding):
     """
     Compare frame with pre-computed reference embedding
     
     Args:
         frame_image_path: Path to video frame image
-        reference_embedding_list: Pre-computed reference embedding as list
+        reference_embedding: Pre-computed reference embedding as list or (pre-loaded) tensor
     
     Returns:
         Similarity score (0-1) or error dict
@@ -175,8 +525,8 @@ def compare_with_embedding(frame_image_path: str, reference_embedding_list: list
         if isinstance(model, dict):
             return model  # Return error
         
-        # Convert reference embedding back to tensor
-        ref_embedding = torch.tensor(reference_embedding_list, dtype=torch.float32).unsqueeze(0)
+        # Reuse pre-loaded device tensors as-is; only lists need converting/uploading
+        ref_embedding = torch.as_tensor(reference_embedding, dtype=torch.float32, device=device).reshape(1, -1)
         
         # Generate frame embedding
         frame_embedding = embed_image(frame_image_path)
@@ -184,31 +534,213 @@ def compare_with_embedding(frame_image_path: str, reference_embedding_list: list
         if isinstance(frame_embedding, dict) and "error" in frame_embedding:
             return frame_embedding
         
-        # Compute cosine similarity
-        similarity = torch.cosine_similarity(ref_embedding, frame_embedding).item()
-        similarity = max(0.0, similarity)
+        # Reference is unit-norm (saved by embed), so cosine similarity is a plain dot product
+        _check_unit_norm(ref_embedding)
+        similarity = (ref_embedding * frame_embedding).sum().item()
+        
+        return score_similarity(similarity)
+    except Exception as e:
+        return {"error": f"Failed to compare with embedding: {str(e)}"}
+
+
+def compare_with_embedding_batch(frame_image_paths: list, reference_embedding):
+    """
+    Compare many frames with a pre-computed reference embedding in one batch
+    
+    Args:
+        frame_image_paths: Paths to video frame images
+        reference_embedding: Pre-computed reference embedding as list or tensor
+    
+    Returns:
+        List of similarity results (one per frame, in order) or error dict
+    """
+    try:
+        if not frame_image_paths:
+            return []
+        
+        ref_embedding = torch.as_tensor(reference_embedding, dtype=torch.float32, device=model_device()).reshape(1, -1)
+        _check_unit_norm(ref_embedding)
+        
+        frame_embeddings = embed_images(frame_image_paths)
         
-        # Stricter thresholds for product matching
-        match_threshold = 0.40  # Minimum similarity to consider a match
-        high_threshold = 0.50   # High confidence threshold
-        medium_threshold = 0.45 # Medium confidence threshold
+        if isinstance(frame_embeddings, dict) and "error" in frame_embeddings:
+            return frame_embeddings
         
-        is_match = similarity >= match_threshold
-        confidence = "high" if similarity >= high_threshold else "medium" if similarity >= medium_threshold else "low" if is_match else "none"
+        # (N, D) @ (D, 1) -> (N,) cosine similarities (both sides are unit-norm)
+        similarities = (frame_embeddings @ ref_embedding.T).squeeze(-1).tolist()
+        
+        return [
+            {"frame": frame_path, **score_similarity(similarity)}
+            for frame_path, similarity in zip(frame_image_paths, similarities)
+        ]
+    except Exception as e:
+        return {"error": f"Failed to compare frames with embedding: {str(e)}"}
+
+
+def load_embedding_file(embedding_file: str):
+    """
+    Load a reference embedding saved by the embed command
+    
+    Args:
+        embedding_file: Path to embedding JSON file
+    
+    Returns:
+        Embedding as list or error dict
+    """
+    try:
+        with open(embedding_file, 'r') as f:
+            embedding_data = json.load(f)
+    except Exception as e:
+        return {"error": f"Failed to read embedding file: {str(e)}"}
+    
+    if "embedding" not in embedding_data:
+        return {"error": "Invalid embedding file format"}
+    
+    return embedding_data["embedding"]
+
+
+# Loaded reference embeddings/banks keyed by file path (LRU - a long-lived worker sees a
+# new bank every time the reference images change)
+REFERENCE_CACHE_SIZE = 8
+_reference_cache = OrderedDict()
+
+
+def _get_cached_reference(path: str):
+    reference = _reference_cache.get(path)
+    if reference is not None:
+        _reference_cache.move_to_end(path)
+    return reference
+
+
+def _cache_reference(path: str, reference):
+    _reference_cache[path] = reference
+    _reference_cache.move_to_end(path)
+    if len(_reference_cache) > REFERENCE_CACHE_SIZE:
+        _reference_cache.popitem(last=False)
+    return reference
+
+
+def load_reference_embedding(embedding_file: str):
+    """
+    Load a reference embedding JSON file as a tensor (cached per file)
+    
+    Args:
+        embedding_file: Path to embedding JSON file
+    
+    Returns:
+        Embedding tensor of shape (1, D) or error dict
+    """
+    cached = _get_cached_reference(embedding_file)
+    if cached is not None:
+        return cached
+    
+    embedding = load_embedding_file(embedding_file)
+    if isinstance(embedding, dict) and "error" in embedding:
+        return embedding
+    # Upload once; later compares reuse the device tensor
+    return _cache_reference(embedding_file, torch.tensor(embedding, dtype=torch.float32, device=model_device()).unsqueeze(0))
+
+
+def save_reference_bank(reference_image_paths: list, output_path: str):
+    """
+    Embed reference images and save them as a single FP16 matrix (.npy)
+    Images that fail to embed are left out of the bank
+    
+    Args:
+        reference_image_paths: Paths to reference product images
+        output_path: Destination .npy file
+    
+    Returns:
+        Dict with bank path, count, dimension, the indices of the images kept (bank row order)
+        and per-image errors, or error dict if no image could be embedded
+    """
+    try:
+        # Embed one reference at a time so a single unreadable image doesn't fail the bank
+        embeddings = []
+        indices = []
+        errors = {}
+        for index, image_path in enumerate(reference_image_paths):
+            embedding = embed_image(image_path)
+            if isinstance(embedding, dict) and "error" in embedding:
+                errors[image_path] = embedding["error"]
+                continue
+            embeddings.append(embedding)
+            indices.append(index)
+        
+        if not embeddings:
+            return {"error": f"Failed to embed any reference image: {next(iter(errors.values()), 'no images')}"}
+        
+        # Rows are already unit-norm; FP16 halves the on-disk footprint
+        bank = torch.cat(embeddings).cpu().numpy().astype(np.float16)
+        np.save(output_path, bank)
         
         return {
-            "similarity": float(similarity),
-            "match": is_match,
-            "confidence": confidence
+            "bank": output_path,
+            "count": int(bank.shape[0]),
+            "dimension": int(bank.shape[1]),
+            "indices": indices,
+            "errors": errors
         }
     except Exception as e:
-        return {"error": f"Failed to compare with embedding: {str(e)}"}
+        return {"error": f"Failed to save reference bank: {str(e)}"}
+
+
+def load_reference_bank(bank_path: str):
+    """
+    Load a reference bank saved by save_reference_bank (cached per file)
+    
+    Args:
+        bank_path: Path to .npy reference bank
+    
+    Returns:
+        Embedding matrix tensor of shape (N, D) or error dict
+    """
+    cached = _get_cached_reference(bank_path)
+    if cached is not None:
+        return cached
+    
+    try:
+        bank = np.load(bank_path)
+    except Exception as e:
+        return {"error": f"Failed to load reference bank: {str(e)}"}
+    # Upload the FP16 rows once and widen to FP32 on the device; later matches reuse the tensor
+    return _cache_reference(bank_path, torch.from_numpy(bank).to(model_device()).float())
+
+
+def match_with_bank(frame_image_path: str, bank):
+    """
+    Compare a frame against every reference embedding in a bank with one matmul
+    
+    Args:
+        frame_image_path: Path to video frame image
+        bank: Reference embedding matrix of shape (N, D)
+    
+    Returns:
+        Best match result (with referenceIndex and all similarities) or error dict
+    """
+    try:
+        frame_embedding = embed_image(frame_image_path)
+        
+        if isinstance(frame_embedding, dict) and "error" in frame_embedding:
+            return frame_embedding
+        
+        # (1, D) @ (D, N) -> one cosine similarity per reference, copied to host once
+        similarities = (frame_embedding @ bank.T).squeeze(0).tolist()
+        best_index = max(range(len(similarities)), key=similarities.__getitem__)
+        
+        return {
+            **score_similarity(similarities[best_index]),
+            "referenceIndex": best_index,
+            "similarities": similarities
+        }
+    except Exception as e:
+        return {"error": f"Failed to match with reference bank: {str(e)}"}
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print(json.dumps({"error": "Usage: python clip_similarity.py <command> [args...]"}))
-        print(json.dumps({"error": "Commands: embed <image_path> | similarity <ref_path> <frame_path> | compare <frame_path> <embedding_json>"}))
+        print(json.dumps({"error": "Commands: embed <image_path> | similarity <ref_path> <frame_path|frames_dir> | compare <frame_path> <embedding_json> | bank <output_npy> <image_path>... | match <frame_path> <bank_npy>"}))
         sys.exit(1)
     
     command = sys.argv[1].lower()
@@ -228,7 +760,7 @@ if __name__ == "__main__":
         
     elif command == "similarity":
         if len(sys.argv) < 4:
-            print(json.dumps({"error": "Usage: python clip_similarity.py similarity <reference_image_path> <frame_image_path>"}))
+            print(json.dumps({"error": "Usage: python clip_similarity.py similarity <reference_image_path> <frame_image_path|frames_dir>"}))
             sys.exit(1)
         
         ref_path = sys.argv[2]
@@ -241,7 +773,17 @@ if __name__ == "__main__":
             print(json.dumps({"error": f"Frame image not found: {frame_path}"}))
             sys.exit(1)
         
-        result = compute_similarity(ref_path, frame_path)
+        if os.path.isdir(frame_path):
+            # Directory of frames: embed the reference once and all frames in one batch
+            ref_result = embed_reference(ref_path)
+            if "error" in ref_result:
+                print(json.dumps(ref_result))
+                sys.exit(1)
+            result = compare_with_embedding_batch(list_frame_images(frame_path), ref_result["embedding"])
+            if isinstance(result, list):
+                result = {"results": result}
+        else:
+            result = compute_similarity(ref_path, frame_path)
         print(json.dumps(result))
         
     elif command == "compare":
@@ -260,14 +802,51 @@ if __name__ == "__main__":
             sys.exit(1)
         
         # Load embedding from JSON file
-        with open(embedding_file, 'r') as f:
-            embedding_data = json.load(f)
+        embedding = load_embedding_file(embedding_file)
+        if isinstance(embedding, dict) and "error" in embedding:
+            print(json.dumps(embedding))
+            sys.exit(1)
+        
+        result = compare_with_embedding(frame_path, embedding)
+        print(json.dumps(result))
+        
+    elif command == "bank":
+        if len(sys.argv) < 4:
+            print(json.dumps({"error": "Usage: python clip_similarity.py bank <output_npy> <image_path> [image_path...]"}))
+            sys.exit(1)
+        
+        output_path = sys.argv[2]
+        image_paths = sys.argv[3:]
+        
+        for image_path in image_paths:
+            if not os.path.exists(image_path):
+                print(json.dumps({"error": f"Image file not found: {image_path}"}))
+                sys.exit(1)
+        
+        result = save_reference_bank(image_paths, output_path)
+        print(json.dumps(result))
+        
+    elif command == "match":
+        if len(sys.argv) < 4:
+            print(json.dumps({"error": "Usage: python clip_similarity.py match <frame_image_path> <bank_npy>"}))
+            sys.exit(1)
+        
+        frame_path = sys.argv[2]
+        bank_path = sys.argv[3]
+        
+        if not os.path.exists(frame_path):
+            print(json.dumps({"error": f"Frame image not found: {frame_path}"}))
+            sys.exit(1)
+        if not os.path.exists(bank_path):
+            print(json.dumps({"error": f"Reference bank not found: {bank_path}"}))
+            sys.exit(1)
         
-        if "embedding" not in embedding_data:
-            print(json.dumps({"error": "Invalid embedding file format"}))
+        bank = load_reference_bank(bank_path)
+        if isinstance(bank, dict) and "error" in bank:
+            print(json.dumps(bank))
             sys.exit(1)
         
-        result = compare_with_embedding(frame_path, embedding_data["embedding"])
+        result = match_with_bank(frame_path, bank)
         print(json.dumps(result))
         
     else:
@@ -3,10 +3,10 @@
 YOLO Object Detection Script
 Detects objects in an image using Ultralytics YOLO
 """
+import functools
 import json
 import sys
 import os
-from pathlib import Path
 
 # Suppress all non-essential output
 import warnings
@@ -23,11 +23,72 @@ class SuppressOutput:
 _stderr_backup = sys.stderr
 
 try:
+    import torch
     from ultralytics import YOLO
+    from model_config import YOLO_ONNX_PATH, YOLO_WEIGHTS_PATH, select_onnx_path
 except ImportError:
     print(json.dumps({"error": "ultralytics not installed. Run: pip install ultralytics"}))
     sys.exit(1)
 
+# ONNX Runtime is optional - used when an exported model is present (see export.py)
+try:
+    import onnxruntime
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Maximum number of images per batched forward pass
+DETECT_BATCH_SIZE = 32
+# Inference device, chosen once so the predictor never migrates the model between calls
+DEVICE = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+
+
+def use_onnx_model():
+    """
+    Whether the ONNX Runtime export is used instead of the PyTorch weights
+    Only on CPU-only hosts; with CUDA, YOLO stays on the (fused) PyTorch model
+    """
+    return DEVICE == 'cpu' and ONNX_AVAILABLE and os.path.exists(YOLO_ONNX_PATH)
+
+
+@functools.lru_cache(maxsize=1)
+def get_model():
+    """Get or load YOLOv8n model (cached)"""
+    # Suppress stderr during model loading
+    sys.stderr = SuppressOutput()
+    try:
+        # Load YOLOv8n model (nano - lightweight), preferring the ONNX Runtime export
+        if use_onnx_model():
+            return YOLO(select_onnx_path(YOLO_ONNX_PATH, DEVICE), task='detect')
+
+        model = YOLO(YOLO_WEIGHTS_PATH)
+        # Fold BatchNorm into the preceding convolutions (PyTorch weights only)
+        model.fuse()
+        return model
+    finally:
+        sys.stderr = _stderr_backup
+
+
+def extract_class_names(model, results):
+    """
+    Collect unique lower-cased class names from YOLO results
+    Concatenates all box classes and de-duplicates on device, so there is a single
+    device-to-host copy regardless of box count
+    
+    Args:
+        model: Loaded YOLO model
+        results: Iterable of YOLO results
+    
+    Returns:
+        List of detected object class names
+    """
+    cls_tensors = [result.boxes.cls for result in results if result.boxes is not None and len(result.boxes)]
+    if not cls_tensors:
+        return []
+    
+    unique_ids = torch.cat(cls_tensors).unique().to('cpu').int().tolist()
+    return list({model.names[class_id].lower() for class_id in unique_ids})
+
 
 def detect_objects(image_path: str, confidence_threshold: float = 0.25):
     """
@@ -41,40 +102,98 @@ def detect_objects(image_path: str, confidence_threshold: float = 0.25):
         List of detected object class names
     """
     try:
-        # Suppress stderr during model loading and inference
+        model = get_model()
+
+        # Suppress stderr during inference
         sys.stderr = SuppressOutput()
         
-        # Load YOLOv8n model (nano - lightweight)
-        model = YOLO('yolov8n.pt')
-        
         # Run inference with verbose=False and suppress all output
-        results = model(image_path, conf=confidence_threshold, verbose=False, show=False)
+        with torch.inference_mode():
+            results = model(image_path, conf=confidence_threshold, device=DEVICE, verbose=False, show=False)
         
         # Restore stderr
         sys.stderr = _stderr_backup
         
         # Extract unique class names
-        detected_classes = set()
-        for result in results:
-            if result.boxes is not None:
-                for box in result.boxes:
-                    class_id = int(box.cls[0])
-                    class_name = model.names[class_id]
-                    detected_classes.add(class_name.lower())
+        return extract_class_names(model, results)
+    except Exception as e:
+        sys.stderr = _stderr_backup
+        return {"error": str(e)}
+
+
+def detect_objects_batch(image_paths: list, confidence_threshold: float = 0.25):
+    """
+    Detect objects in several images with batched forward passes
+    
+    Args:
+        image_paths: Paths to image files
+        confidence_threshold: Minimum confidence score (0-1)
+    
+    Returns:
+        List of detected object class name lists (one per image, in order)
+    """
+    try:
+        if not image_paths:
+            return []
         
-        return list(detected_classes)
+        model = get_model()
+
+        # Suppress stderr during inference
+        sys.stderr = SuppressOutput()
+        
+        with torch.inference_mode():
+            # One predict call; Ultralytics batches the sources through the network
+            results = model(
+                image_paths,
+                conf=confidence_threshold,
+                device=DEVICE,
+                batch=min(len(image_paths), DETECT_BATCH_SIZE),
+                stream=False,
+                verbose=False,
+                show=False,
+            )
+        
+        # Restore stderr
+        sys.stderr = _stderr_backup
+        
+        # Results come back in input order, one per image
+        return [extract_class_names(model, [result]) for result in results]
     except Exception as e:
+        sys.stderr = _stderr_backup
         return {"error": str(e)}
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: python detect.py <image_path> [confidence_threshold]"}))
+        print(json.dumps({"error": "Usage: python detect.py <image_path | json_array_of_paths> [confidence_threshold]"}))
         sys.exit(1)
     
-    image_path = sys.argv[1]
+    image_arg = sys.argv[1]
     confidence = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
     
+    # A JSON array of paths runs batched detection and prints one result per image
+    if image_arg.lstrip().startswith('['):
+        try:
+            image_paths = json.loads(image_arg)
+        except json.JSONDecodeError as e:
+            print(json.dumps({"error": f"Invalid image path list: {str(e)}"}))
+            sys.exit(1)
+        
+        for image_path in image_paths:
+            if not os.path.exists(image_path):
+                print(json.dumps({"error": f"Image file not found: {image_path}"}))
+                sys.exit(1)
+        
+        result = detect_objects_batch(image_paths, confidence)
+        
+        if isinstance(result, dict) and "error" in result:
+            print(json.dumps(result))
+            sys.exit(1)
+        print(json.dumps({"results": result}))
+        sys.exit(0)
+    
+    image_path = image_arg
+    
     if not os.path.exists(image_path):
         print(json.dumps({"error": f"Image file not found: {image_path}"}))
         sys.exit(1)
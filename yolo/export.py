@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Model Export Script
+Exports the CLIP ViT-B/32 visual encoder and YOLOv8n to ONNX for ONNX Runtime inference,
+and optionally quantizes the exports to INT8 for CPU-only hosts.
+clip_similarity.py and detect.py pick up the exported models automatically when present.
+"""
+import json
+import sys
+import os
+
+# Suppress warnings
+import warnings
+warnings.filterwarnings('ignore')
+
+try:
+    import torch
+except ImportError:
+    print(json.dumps({"error": "torch not installed. Run: pip install -r requirements_onnx.txt"}))
+    sys.exit(1)
+
+from model_config import (
+    CLIP_ONNX_PATH,
+    IMAGE_EXTENSIONS,
+    YOLO_INPUT_SIZE,
+    YOLO_ONNX_PATH,
+    YOLO_WEIGHTS_PATH,
+    int8_path,
+)
+
+ONNX_OPSET = 17
+
+# Number of representative frames used to calibrate INT8 activation ranges
+CALIBRATION_SIZE = 256
+
+
+def export_clip(output_path: str = CLIP_ONNX_PATH):
+    """
+    Export the CLIP visual encoder with a dynamic batch dimension
+    
+    Args:
+        output_path: Destination .onnx file
+    
+    Returns:
+        Dict with exported path or error dict
+    """
+    try:
+        import clip
+        
+        # Export in FP32 from CPU; ONNX Runtime handles device placement
+        model, _ = clip.load("ViT-B/32", device="cpu", jit=False)
+        model.eval()
+        
+        dummy_input = torch.randn(1, 3, 224, 224)
+        torch.onnx.export(
+            model.visual,
+            dummy_input,
+            output_path,
+            opset_version=ONNX_OPSET,
+            input_names=['input'],
+            output_names=['embedding'],
+            dynamic_axes={'input': {0: 'B'}, 'embedding': {0: 'B'}},
+        )
+        
+        return {"clip": output_path}
+    except Exception as e:
+        return {"error": f"Failed to export CLIP: {str(e)}"}
+
+
+def export_yolo(weights_path: str = YOLO_WEIGHTS_PATH):
+    """
+    Export YOLOv8n to ONNX (written next to the weights as yolov8n.onnx)
+    
+    Args:
+        weights_path: Path to YOLO .pt weights
+    
+    Returns:
+        Dict with exported path or error dict
+    """
+    try:
+        from ultralytics import YOLO
+        
+        model = YOLO(weights_path)
+        output_path = model.export(format='onnx', dynamic=True, simplify=True, opset=ONNX_OPSET)
+        
+        return {"yolo": str(output_path)}
+    except Exception as e:
+        return {"error": f"Failed to export YOLO: {str(e)}"}
+
+
+def _calibration_images(calibration_dir: str):
+    """Up to CALIBRATION_SIZE image paths from a directory of representative frames"""
+    names = sorted(n for n in os.listdir(calibration_dir) if n.lower().endswith(IMAGE_EXTENSIONS))
+    return [os.path.join(calibration_dir, n) for n in names[:CALIBRATION_SIZE]]
+
+
+def _clip_calibration_input(image_path: str):
+    from clip_similarity import build_preprocess
+    from image_io import load_rgb
+    
+    preprocess = build_preprocess()
+    return preprocess(load_rgb(image_path)).unsqueeze(0).numpy()
+
+
+def _yolo_calibration_input(image_path: str):
+    import numpy as np
+    from ultralytics.data.augment import LetterBox
+    from image_io import load_rgb_array
+    
+    # Letterbox (aspect kept, gray 114 padding) like inference, so calibrated ranges match real inputs
+    image = LetterBox((YOLO_INPUT_SIZE, YOLO_INPUT_SIZE), auto=False)(image=load_rgb_array(image_path))
+    array = image.astype(np.float32) / 255.0
+    return array.transpose(2, 0, 1)[None]
+
+
+def quantize_model(onnx_path: str, calibration_dir: str, make_input):
+    """
+    Post-training static INT8 quantization (QDQ format) of an exported model
+    
+    Args:
+        onnx_path: Exported FP32 .onnx model
+        calibration_dir: Directory of representative frames
+        make_input: Function mapping an image path to the model's input array
+    
+    Returns:
+        Path of the quantized model or error dict
+    """
+    try:
+        import onnxruntime as ort
+        from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+        
+        if not os.path.exists(onnx_path):
+            return {"error": f"Exported model not found: {onnx_path}. Run the export first."}
+        
+        image_paths = _calibration_images(calibration_dir)
+        if not image_paths:
+            return {"error": f"No calibration images found in: {calibration_dir}"}
+        
+        input_name = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+        
+        class FrameCalibrationReader(CalibrationDataReader):
+            def __init__(self):
+                self.paths = iter(image_paths)
+            
+            def get_next(self):
+                path = next(self.paths, None)
+                return None if path is None else {input_name: make_input(path)}
+        
+        output_path = int8_path(onnx_path)
+        quantize_static(
+            onnx_path,
+            output_path,
+            FrameCalibrationReader(),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+        )
+        
+        return output_path
+    except Exception as e:
+        return {"error": f"Failed to quantize {onnx_path}: {str(e)}"}
+
+
+def quantize(target: str, calibration_dir: str):
+    """Quantize the exported CLIP and/or YOLO models"""
+    result = {}
+    if target in ("clip", "all"):
+        output = quantize_model(CLIP_ONNX_PATH, calibration_dir, _clip_calibration_input)
+        if isinstance(output, dict):
+            return output
+        result["clip_int8"] = output
+    if target in ("yolo", "all"):
+        output = quantize_model(YOLO_ONNX_PATH, calibration_dir, _yolo_calibration_input)
+        if isinstance(output, dict):
+            return output
+        result["yolo_int8"] = output
+    return result
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    
+    if args and args[0].lower() == "quantize":
+        if len(args) < 2:
+            print(json.dumps({"error": "Usage: python export.py quantize <calibration_frames_dir> [clip|yolo|all]"}))
+            sys.exit(1)
+        
+        calibration_dir = args[1]
+        target = args[2].lower() if len(args) > 2 else "all"
+        
+        if not os.path.isdir(calibration_dir):
+            print(json.dumps({"error": f"Calibration directory not found: {calibration_dir}"}))
+            sys.exit(1)
+        if target not in ("clip", "yolo", "all"):
+            print(json.dumps({"error": "Usage: python export.py quantize <calibration_frames_dir> [clip|yolo|all]"}))
+            sys.exit(1)
+        
+        result = quantize(target, calibration_dir)
+        print(json.dumps(result))
+        if "error" in result:
+            sys.exit(1)
+        sys.exit(0)
+    
+    target = args[0].lower() if args else "all"
+    
+    if target not in ("clip", "yolo", "all"):
+        print(json.dumps({"error": "Usage: python export.py [clip|yolo|all] | quantize <calibration_frames_dir> [clip|yolo|all]"}))
+        sys.exit(1)
+    
+    result = {}
+    if target in ("clip", "all"):
+        result.update(export_clip())
+    if target in ("yolo", "all") and "error" not in result:
+        result.update(export_yolo())
+    
+    print(json.dumps(result))
+    if "error" in result:
+        sys.exit(1)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Image Loading Helpers
+Decodes frames for CLIP and OCR, using libjpeg-turbo (PyTurboJPEG) for JPEGs when available
+"""
+import os
+
+from PIL import Image
+
+# PyTurboJPEG is optional - it needs the libturbojpeg shared library at runtime
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _jpeg_decoder = TurboJPEG()
+except Exception:
+    _jpeg_decoder = None
+
+JPEG_EXTENSIONS = ('.jpg', '.jpeg')
+
+
+def load_rgb(image_path: str):
+    """
+    Load an image as an RGB PIL image
+    
+    Args:
+        image_path: Path to the image file
+    
+    Returns:
+        RGB PIL image
+    """
+    if _jpeg_decoder is not None and os.path.splitext(image_path)[1].lower() in JPEG_EXTENSIONS:
+        with open(image_path, 'rb') as f:
+            pixels = _jpeg_decoder.decode(f.read(), pixel_format=TJPF_RGB)
+        return Image.fromarray(pixels)
+    
+    return Image.open(image_path).convert('RGB')
+
+
+def load_rgb_array(image_path: str):
+    """
+    Load an image as a raw RGB array without any resizing
+    
+    Args:
+        image_path: Path to the image file
+    
+    Returns:
+        uint8 numpy array of shape (H, W, 3)
+    """
+    import numpy as np
+    
+    if _jpeg_decoder is not None and os.path.splitext(image_path)[1].lower() in JPEG_EXTENSIONS:
+        with open(image_path, 'rb') as f:
+            return _jpeg_decoder.decode(f.read(), pixel_format=TJPF_RGB)
+    
+    return np.asarray(Image.open(image_path).convert('RGB'))
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Model Locations
+Weights/export paths and input sizes shared by detect.py, clip_similarity.py and export.py
+"""
+import os
+
+YOLO_WEIGHTS_PATH = 'yolov8n.pt'
+# Exported models (created by: python yolo/export.py)
+YOLO_ONNX_PATH = os.environ.get('YOLO_ONNX_PATH', 'yolov8n.onnx')
+CLIP_ONNX_PATH = os.environ.get('CLIP_ONNX_PATH', 'clip_vit_b32_visual.onnx')
+
+# YOLO network input size (letterboxed square)
+YOLO_INPUT_SIZE = 640
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def int8_path(onnx_path: str):
+    """Path of the INT8 variant of an exported model (model.onnx -> model.int8.onnx)"""
+    root, ext = os.path.splitext(onnx_path)
+    return f"{root}.int8{ext}"
+
+
+def select_onnx_path(onnx_path: str, device: str):
+    """
+    Pick the model file to run: the INT8 variant on CPU when it exists, otherwise the FP32 export
+
+    Args:
+        onnx_path: Exported FP32 .onnx model
+        device: Device inference runs on ("cpu" or a CUDA device)
+
+    Returns:
+        Path of the model file to load
+    """
+    quantized_path = int8_path(onnx_path)
+    if device == 'cpu' and os.path.exists(quantized_path):
+        return quantized_path
+    return onnx_path
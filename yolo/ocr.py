@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 OCR Script using pytesseract
-Reads text from an image using Tesseract OCR
+Reads text from an image using Tesseract OCR (or PaddleOCR when OCR_ENGINE=paddle)
 """
 import json
 import sys
@@ -10,95 +10,230 @@ import os
 try:
     import pytesseract
     from PIL import Image
+    from image_io import load_rgb
 except ImportError:
     print(json.dumps({"error": "pytesseract not installed. Run: pip install pytesseract pillow"}))
     sys.exit(1)
 
+# numpy is needed for preprocessing and the PaddleOCR engine, OpenCV only for preprocessing (--preprocess)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# tesserocr is optional - it calls the Tesseract C API in-process, so language data is
+# loaded once instead of spawning a tesseract subprocess per image
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# OCR backend: "tesseract" (default) or "paddle" (PaddleOCR, pip install paddleocr paddlepaddle)
+OCR_ENGINE = os.environ.get('OCR_ENGINE', 'tesseract').lower()
+
+# Directory with the tessdata_fast models (https://github.com/tesseract-ocr/tessdata_fast) -
+# integer-quantized LSTM models that are several times faster than the default tessdata_best
+TESSDATA_FAST_DIR = os.environ.get('TESSDATA_FAST_DIR')
+
+# PSM 6 (uniform block of text) suits packaging labels; OEM 1 is the LSTM engine
+TESSERACT_CONFIG = '--psm 6 --oem 1'
+if TESSDATA_FAST_DIR:
+    TESSERACT_CONFIG += f' --tessdata-dir "{TESSDATA_FAST_DIR}"'
+
+TESSERACT_MISSING_ERROR = "tesseract is not installed or it's not in your PATH. See README file for more information."
+
+# Shared tesserocr API instance (only used when tesserocr is installed)
+_api_cache = None
+
+
+def get_tesseract_api():
+    """Get or create the shared tesserocr API (None if tesserocr is not installed)"""
+    global _api_cache
+
+    if tesserocr is not None and _api_cache is None:
+        kwargs = {'path': TESSDATA_FAST_DIR} if TESSDATA_FAST_DIR else {}
+        _api_cache = tesserocr.PyTessBaseAPI(
+            **kwargs,
+            lang='eng',
+            psm=tesserocr.PSM.SINGLE_BLOCK,
+            oem=tesserocr.OEM.LSTM_ONLY,
+        )
+
+    return _api_cache
+
+
+# Shared PaddleOCR instance (only used when OCR_ENGINE=paddle)
+_paddle_cache = None
 
-def read_text(image_path: str):
+
+def get_paddle_ocr():
+    """Get or create the shared PaddleOCR recognizer (CPU, MKL-DNN accelerated)"""
+    global _paddle_cache
+
+    if _paddle_cache is None:
+        from paddleocr import PaddleOCR
+        # Paddle inference with MKL-DNN; PaddleOCR's use_onnx mode needs separately converted
+        # det/rec ONNX models, which this repo does not produce
+        _paddle_cache = PaddleOCR(lang='en', use_angle_cls=False, use_gpu=False, enable_mkldnn=True, show_log=False)
+
+    return _paddle_cache
+
+
+# Cached OCR engine availability check (the tesseract version probe spawns a subprocess)
+_engine_checked = False
+
+
+def check_engine():
+    """
+    Verify the OCR engine is available (cached after the first success)
+
+    Returns:
+        None if available, otherwise an error dict
+    """
+    global _engine_checked
+
+    if not _engine_checked:
+        if OCR_ENGINE == 'paddle':
+            try:
+                get_paddle_ocr()
+            except ImportError:
+                return {"error": "paddleocr not installed. Run: pip install paddleocr paddlepaddle"}
+            _engine_checked = True
+            return None
+        try:
+            if get_tesseract_api() is None:
+                pytesseract.get_tesseract_version()
+        except Exception:
+            return {"error": TESSERACT_MISSING_ERROR}
+        _engine_checked = True
+
+    return None
+
+
+def _recognize_paddle(image):
+    """Run PaddleOCR detection + recognition and join the recognized lines"""
+    # PaddleOCR expects 3-channel BGR arrays
+    pixels = np.ascontiguousarray(np.array(image.convert('RGB'))[:, :, ::-1])
+    result = get_paddle_ocr().ocr(pixels, cls=False)
+
+    # One entry per image: a list of [box, (text, score)] lines (None if nothing found)
+    lines = result[0] if result and result[0] else []
+    return ' '.join(text for _, (text, _) in lines).strip()
+
+
+def recognize(image):
+    """
+    Run a single OCR pass over an image
+    
+    Args:
+        image: PIL image
+    
+    Returns:
+        Recognized text (stripped)
+    """
+    if OCR_ENGINE == 'paddle':
+        return _recognize_paddle(image)
+
+    api = get_tesseract_api()
+    if api is not None:
+        api.SetImage(image)
+        return api.GetUTF8Text().strip()
+
+    return pytesseract.image_to_string(image, lang='eng', config=TESSERACT_CONFIG).strip()
+
+
+def _preprocess_for_ocr(image):
+    """
+    Grayscale, 2x upscale and Otsu-binarize an image so Tesseract gets clean text
+    
+    Args:
+        image: PIL image
+    
+    Returns:
+        Binarized PIL image
+    """
+    if cv2 is None:
+        raise ImportError("opencv-python-headless is required for OCR preprocessing. Run: pip install opencv-python-headless")
+    
+    gray = np.array(image.convert('L'))
+    # Upscale small packaging text so glyphs are large enough for the LSTM recognizer
+    gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return Image.fromarray(binary)
+
+
+def dedupe_words(text: str):
+    """
+    Remove repeated words (case-insensitive) while preserving order
+    
+    Args:
+        text: OCR output
+    
+    Returns:
+        Text with each word kept at its first occurrence
+    """
+    seen = set()
+    unique_words = []
+    for word in text.split():
+        key = word.casefold()
+        if key not in seen:
+            seen.add(key)
+            unique_words.append(word)
+    return ' '.join(unique_words)
+
+
+def read_text(image_path: str, preprocess: bool = False):
     """
     Read text from an image using OCR
     
     Args:
         image_path: Path to the image file
+        preprocess: Grayscale, upscale and binarize the image before OCR
     
     Returns:
         Extracted text string
     """
     try:
-        # Check if tesseract is available
-        try:
-            pytesseract.get_tesseract_version()
-        except Exception as e:
-            return {"error": "tesseract is not installed or it's not in your PATH. See README file for more information."}
+        # Check if the OCR engine is available
+        error = check_engine()
+        if error:
+            return error
         
         # Open and process image
-        image = Image.open(image_path)
-        
-        # Try multiple OCR configurations for better text extraction
-        # Packaging text can be challenging, so we try different PSM modes
-        texts = []
-        
-        # Try PSM 6 (uniform block of text) - good for packaging labels
-        try:
-            text1 = pytesseract.image_to_string(image, lang='eng', config='--psm 6').strip()
-            if text1:
-                texts.append(text1)
-        except:
-            pass
-        
-        # Try PSM 11 (sparse text) - good for text overlays
-        try:
-            text2 = pytesseract.image_to_string(image, lang='eng', config='--psm 11').strip()
-            if text2 and text2 != text1:
-                texts.append(text2)
-        except:
-            pass
-        
-        # Try default (PSM 3) as fallback
-        try:
-            text3 = pytesseract.image_to_string(image, lang='eng').strip()
-            if text3 and text3 not in texts:
-                texts.append(text3)
-        except:
-            pass
+        image = load_rgb(image_path)
+        if preprocess:
+            image = _preprocess_for_ocr(image)
         
-        # Combine all detected text, removing duplicates
-        # Use the longest text as it's likely most complete
-        if texts:
-            combined_text = ' '.join(texts)
-            # Remove duplicate words while preserving order
-            words = combined_text.split()
-            seen = set()
-            unique_words = []
-            for word in words:
-                word_lower = word.lower()
-                if word_lower not in seen:
-                    seen.add(word_lower)
-                    unique_words.append(word)
-            return ' '.join(unique_words)
+        # Single PSM 6 pass - good for packaging labels
+        text = recognize(image)
         
-        return ''
+        return dedupe_words(text)
     except Exception as e:
         error_msg = str(e)
         # Provide helpful error message for common issues
-        if 'tesseract' in error_msg.lower() or 'not found' in error_msg.lower():
-            return {"error": "tesseract is not installed or it's not in your PATH. See README file for more information."}
+        if OCR_ENGINE != 'paddle' and ('tesseract' in error_msg.lower() or 'not found' in error_msg.lower()):
+            return {"error": TESSERACT_MISSING_ERROR}
         return {"error": error_msg}
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: python ocr.py <image_path>"}))
+        print(json.dumps({"error": "Usage: python ocr.py <image_path> [--preprocess]"}))
         sys.exit(1)
     
     image_path = sys.argv[1]
+    preprocess = '--preprocess' in sys.argv[2:]
     
     if not os.path.exists(image_path):
         print(json.dumps({"error": f"Image file not found: {image_path}"}))
         sys.exit(1)
     
-    result = read_text(image_path)
+    result = read_text(image_path, preprocess)
     
     # Output as JSON
     if isinstance(result, dict) and "error" in result:
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Persistent Vision Worker
+Serves YOLO detection, CLIP similarity and OCR requests over a line-delimited JSON protocol
+on stdin/stdout, so models are loaded once per process instead of once per frame.
+
+Usage: python worker.py <detect|clip|ocr>
+
+Request (one JSON object per line):
+    {"id": 1, "op": "detect", "image_path": "...", "confidence": 0.5}
+    {"id": 2, "op": "detect_batch", "image_paths": ["...", "..."], "confidence": 0.5}
+    {"id": 3, "op": "embed", "image_path": "..."}
+    {"id": 4, "op": "similarity", "reference_path": "...", "frame_path": "..."}
+    {"id": 5, "op": "compare", "frame_path": "...", "embedding_path": "..."}
+    {"id": 6, "op": "compare_batch", "frame_paths": ["...", "..."], "embedding_path": "..."}
+    {"id": 7, "op": "bank", "image_paths": ["...", "..."], "output_path": "....npy"}
+    {"id": 8, "op": "match", "frame_path": "...", "bank_path": "....npy"}
+    {"id": 9, "op": "ocr", "image_path": "...", "preprocess": false}
+
+Response (one JSON object per line): the same payload the CLI scripts print, plus "id".
+"""
+import json
+import os
+import sys
+
+# Suppress warnings
+import warnings
+warnings.filterwarnings('ignore')
+
+# Keep a handle on the real stdout for protocol messages; anything libraries print
+# (progress bars, download messages) goes to stderr instead of corrupting the stream
+_protocol_out = sys.stdout
+sys.stdout = sys.stderr
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+
+def _require_file(path, label="Image file"):
+    if not path or not os.path.exists(path):
+        return {"error": f"{label} not found: {path}"}
+    return None
+
+
+def _handle_detect(request):
+    import detect
+
+    error = _require_file(request.get("image_path"))
+    if error:
+        return error
+
+    result = detect.detect_objects(request["image_path"], float(request.get("confidence", 0.25)))
+    if isinstance(result, dict) and "error" in result:
+        return result
+    return {"objects": result}
+
+
+def _handle_detect_batch(request):
+    import detect
+
+    image_paths = request.get("image_paths") or []
+    for image_path in image_paths:
+        error = _require_file(image_path)
+        if error:
+            return error
+
+    result = detect.detect_objects_batch(image_paths, float(request.get("confidence", 0.25)))
+    if isinstance(result, dict) and "error" in result:
+        return result
+    return {"results": result}
+
+
+def _handle_embed(request):
+    import clip_similarity
+
+    error = _require_file(request.get("image_path"))
+    if error:
+        return error
+    return clip_similarity.embed_reference(request["image_path"])
+
+
+def _handle_similarity(request):
+    import clip_similarity
+
+    error = _require_file(request.get("reference_path"), "Reference image") \
+        or _require_file(request.get("frame_path"), "Frame image")
+    if error:
+        return error
+    return clip_similarity.compute_similarity(request["reference_path"], request["frame_path"])
+
+
+def _handle_compare(request):
+    import clip_similarity
+
+    error = _require_file(request.get("frame_path"), "Frame image") \
+        or _require_file(request.get("embedding_path"), "Embedding file")
+    if error:
+        return error
+
+    embedding = clip_similarity.load_reference_embedding(request["embedding_path"])
+    if isinstance(embedding, dict) and "error" in embedding:
+        return embedding
+    return clip_similarity.compare_with_embedding(request["frame_path"], embedding)
+
+
+def _handle_compare_batch(request):
+    import clip_similarity
+
+    frame_paths = request.get("frame_paths") or []
+    error = _require_file(request.get("embedding_path"), "Embedding file")
+    for frame_path in frame_paths:
+        error = error or _require_file(frame_path, "Frame image")
+    if error:
+        return error
+
+    embedding = clip_similarity.load_reference_embedding(request["embedding_path"])
+    if isinstance(embedding, dict) and "error" in embedding:
+        return embedding
+
+    result = clip_similarity.compare_with_embedding_batch(frame_paths, embedding)
+    if isinstance(result, dict) and "error" in result:
+        return result
+    return {"results": result}
+
+
+def _handle_bank(request):
+    import clip_similarity
+
+    image_paths = request.get("image_paths") or []
+    if not image_paths:
+        return {"error": "No reference images provided"}
+    for image_path in image_paths:
+        error = _require_file(image_path, "Reference image")
+        if error:
+            return error
+
+    return clip_similarity.save_reference_bank(image_paths, request["output_path"])
+
+
+def _handle_match(request):
+    import clip_similarity
+
+    error = _require_file(request.get("frame_path"), "Frame image") \
+        or _require_file(request.get("bank_path"), "Reference bank")
+    if error:
+        return error
+
+    bank = clip_similarity.load_reference_bank(request["bank_path"])
+    if isinstance(bank, dict) and "error" in bank:
+        return bank
+    return clip_similarity.match_with_bank(request["frame_path"], bank)
+
+
+def _handle_ocr(request):
+    import ocr
+
+    error = _require_file(request.get("image_path"))
+    if error:
+        return error
+
+    result = ocr.read_text(request["image_path"], bool(request.get("preprocess", False)))
+    if isinstance(result, dict) and "error" in result:
+        return result
+    return {"text": result}
+
+
+HANDLERS = {
+    "detect": _handle_detect,
+    "detect_batch": _handle_detect_batch,
+    "embed": _handle_embed,
+    "similarity": _handle_similarity,
+    "compare": _handle_compare,
+    "compare_batch": _handle_compare_batch,
+    "bank": _handle_bank,
+    "match": _handle_match,
+    "ocr": _handle_ocr,
+}
+
+
+def warm_up(model_type: str):
+    """
+    Import the backing module and load its model before serving requests
+
+    Import failures in the backing scripts print a JSON error and exit, which the
+    caller sees as the worker process exiting.
+    """
+    if model_type == "detect":
+        import detect
+        detect.get_model()
+    elif model_type == "clip":
+        import clip_similarity
+        clip_similarity.get_model()
+    elif model_type == "ocr":
+        import ocr
+        ocr.check_engine()
+
+
+def _write(message: dict):
+    _protocol_out.write(json.dumps(message) + "\n")
+    _protocol_out.flush()
+
+
+def handle_request(request: dict):
+    """Dispatch a single decoded request to its handler"""
+    handler = HANDLERS.get(request.get("op"))
+    if handler is None:
+        return {"error": f"Unknown op: {request.get('op')}"}
+
+    try:
+        return handler(request)
+    except SystemExit:
+        # Backing script bailed out at import time (missing dependencies)
+        return {"error": f"Dependencies for '{request.get('op')}' are not installed"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def serve():
+    """Read requests from stdin until EOF"""
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            _write({"error": f"Invalid request: {str(e)}"})
+            continue
+
+        if not isinstance(request, dict):
+            _write({"error": "Invalid request: expected a JSON object"})
+            continue
+
+        response = handle_request(request)
+        response["id"] = request.get("id")
+        _write(response)
+
+
+if __name__ == "__main__":
+    model_type = sys.argv[1].lower() if len(sys.argv) > 1 else None
+
+    if model_type is not None and model_type not in ("detect", "clip", "ocr"):
+        _write({"error": f"Unknown model type: {model_type}. Use: detect | clip | ocr"})
+        sys.exit(1)
+
+    if model_type is not None:
+        # Route import-time errors from the backing scripts to the protocol stream
+        sys.stdout = _protocol_out
+        try:
+            warm_up(model_type)
+        except Exception as e:
+            _write({"error": f"Failed to load {model_type} model: {str(e)}"})
+            sys.exit(1)
+        sys.stdout = sys.stderr
+
+    _write({"ready": True, "model": model_type})
+    serve()